@@ -7,10 +7,13 @@ then the next card appears automatically.
 
 Key points
 ----------
-* Uses `response_checked` + `timer_start` flags in `st.session_state` to
-  control the delay cleanly.
-* No JavaScript needed; a tiny `time.sleep(0.1)` loop plus
-  `st.rerun()` keeps the UI responsive.
+* Uses `response_checked` + `timer_start` flags on a small `QuizState`
+  object in `st.session_state` to control the delay cleanly.
+* The one-second reveal runs inside an `st.fragment(run_every=0.25)`, so
+  only the Hanzi box reruns while it is showing; nothing blocks the
+  server thread.
+* The Hanzi box is mounted once as a small HTML component and updated
+  through a JavaScript `postMessage` bridge; no polling loop needed.
 * **Stop** ends early; **Restart** after completion.
 
 Run:
@@ -18,12 +21,16 @@ Run:
 """
 
 import json
+import pickle
 import random
 import time
+from collections import namedtuple
+from dataclasses import dataclass
 from pathlib import Path
 import argparse
 
 import streamlit as st
+import streamlit.components.v1 as components
 
 DATA_FILE = Path(__file__).with_name("characters_by_chapter.json")
 BRIGHT_GREEN = "#00c853"
@@ -36,148 +43,284 @@ def parse_args() -> dict[str,str]:
     cli_args, _ = parser.parse_known_args()
     return cli_args
 
-def build_deck(data: dict, selected: list[str]):
-    deck = []
+# Resolved once at import; reruns should not re-parse argv.
+CHAPTERS = tuple(parse_args().chapters or ())
+
+# Struct-of-arrays deck: parallel tuples indexed by card position. The
+# html_* fields hold the finished sender snippet per card and color, so
+# render never formats strings on the hot path.
+Deck = namedtuple("Deck", "hanzi english norm html_white html_green html_red")
+
+# Stamped into the pickle sidecar; the mtime check only sees JSON edits,
+# so bump this whenever code baked into a Deck changes (normalize
+# semantics, the sender payload shape, the field list).
+_DECK_SCHEMA = (1, Deck._fields)
+
+
+def build_deck(data: dict, selected: list[str]) -> Deck:
+    cards = []
     for ch in selected:
-        deck.extend(data[ch])
-    random.shuffle(deck)
-    return deck
+        cards.extend(data[ch])
+    hanzi = tuple(card["hanzi"] for card in cards)
+    english = tuple(tuple(card["english"]) for card in cards)
+    return Deck(
+        hanzi=hanzi,
+        english=english,
+        norm=tuple(frozenset(normalize(m) for m in card["english"]) for card in cards),
+        html_white=tuple(_sender_html(h, char_color, "") for h in hanzi),
+        html_green=tuple(
+            _sender_html(h, BRIGHT_GREEN, f"✅ Correct! {', '.join(e)}")
+            for h, e in zip(hanzi, english)
+        ),
+        html_red=tuple(
+            _sender_html(h, BRIGHT_RED, f"❌ Wrong. Correct: {','.join(e)}")
+            for h, e in zip(hanzi, english)
+        ),
+    )
+
+@st.cache_resource
+def _load_chapter_decks(path: Path) -> dict[str, Deck]:
+    """Load one normalized Deck per chapter, via a pickle sidecar.
+
+    JSON parsing plus normalization dominates cold starts, so the result
+    is dumped next to the JSON and reloaded directly while the sidecar is
+    at least as new as the source file.
+    """
+    pkl = path.with_suffix(".pkl")
+    if pkl.exists() and pkl.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            with pkl.open("rb") as f:
+                schema, decks = pickle.load(f)
+            if schema == _DECK_SCHEMA:
+                return decks
+        except (pickle.UnpicklingError, TypeError, ValueError, EOFError, AttributeError):
+            pass  # corrupt or unreadable sidecar: rebuild it
 
-@st.cache_data
-def load_deck(path: Path):
     with path.open("r", encoding="utf-8") as f:
         data = json.load(f)
-    all_chapters = sorted(data.keys(), key=lambda k: int(k.replace("chapter", "")))
-    cli_args = parse_args()
+    decks = {ch: build_deck(data, [ch]) for ch in data}
+    try:
+        with pkl.open("wb") as f:
+            pickle.dump((_DECK_SCHEMA, decks), f, protocol=5)
+    except OSError:
+        pass  # read-only install: just skip the sidecar
+    return decks
 
-    if cli_args.chapters:
-        selected_chapters = [f"chapter{n}" for n in cli_args.chapters if f"chapter{n}" in data]
-        if not selected_chapters:
-            return build_deck(data,all_chapters)
-        else:
-            return build_deck(data, selected_chapters)
 
-    else:
-        return build_deck(data,all_chapters)
+def load_deck(path: Path, chapters: tuple[int, ...]) -> Deck:
+    decks = _load_chapter_decks(path)
+    selected = sorted(decks.keys(), key=lambda k: int(k.replace("chapter", "")))
+
+    if chapters:
+        selected_chapters = [f"chapter{n}" for n in chapters if f"chapter{n}" in decks]
+        if selected_chapters:
+            selected = selected_chapters
+
+    parts = [decks[ch] for ch in selected]
+    return Deck._make(tuple(v for part in vals for v in part) for vals in zip(*parts))
+
 
 
 
+# Strip spacing (including NBSP) in a single C-level pass; casefold
+# handles case for non-ASCII meanings (café, façade) where lower() can
+# fall short.
+_NORM_TABLE = str.maketrans("", "", " \t\u00a0")
+
 
 def normalize(ans: str) -> str:
-    return ans.lower().replace(" ", "")
+    return ans.casefold().translate(_NORM_TABLE)
+
+
+@dataclass(slots=True)
+class QuizState:
+    """Per-session quiz bookkeeping, stored once under st.session_state.s.
+
+    One proxy lookup per rerun instead of one per field; the widget-bound
+    "answer" key has to stay directly in session state.
+    """
+
+    idx: int = 0
+    score: int = 0
+    response_checked: bool = False
+    correct: bool | None = None
+    timer_start: float | None = None
+    last_render: tuple = (None, None)
 
 
 
 # ---------- Render helper ----------
-BOX_TEMPLATE = """
-<div style="width:300px;height:300px;border:2px solid #ddd;margin:auto;
-            display:flex;align-items:center;justify-content:center;">
-  <span style="font-size:200px;line-height:1;color:{color};">
-    {char}
-  </span>
+# The Hanzi box and the feedback line are mounted once as a single tiny
+# HTML component; updates arrive via postMessage, so no Markdown is
+# re-parsed and no React children are rebuilt when the card changes, and
+# box plus feedback travel as one payload instead of two elements.
+_HZ_MOUNT_HTML = """
+<div id="hzbox" style="width:300px;height:300px;border:2px solid #ddd;margin:auto;
+            display:flex;align-items:center;justify-content:center;visibility:hidden;">
+  <span id="hz" style="font-size:200px;line-height:1;color:#FFFFFF;"></span>
 </div>
+<p id="fb" style="text-align:center;font-family:sans-serif;min-height:1.5em;"></p>
+<script>
+window.addEventListener("message", (e) => {
+  if (!e.data || e.data.type !== "hz-update") return;
+  const hz = document.getElementById("hz");
+  hz.textContent = e.data.char;
+  hz.style.color = e.data.color;
+  document.getElementById("fb").textContent = e.data.fb;
+  document.getElementById("hzbox").style.visibility = e.data.char ? "visible" : "hidden";
+});
+</script>
 """
+
+# Component iframes are sandboxed siblings, so the sender broadcasts to
+# every parent frame; the retries cover the first page load, before the
+# display frame has registered its listener. Each new render replaces
+# this iframe, which kills stale timers.
+_HZ_SEND_TEMPLATE = """
+<script>
+const msg = {payload};
+let tries = 0;
+const send = () => {{
+  for (let i = 0; i < window.parent.frames.length; i++) {{
+    try {{ window.parent.frames[i].postMessage(msg, "*"); }} catch (err) {{}}
+  }}
+  if (++tries < 10) setTimeout(send, 100);
+}};
+send();
+</script>
+"""
+
+
+def _sender_html(char: str, color: str, fb: str) -> str:
+    payload = json.dumps({"type": "hz-update", "char": char, "color": color, "fb": fb})
+    return _HZ_SEND_TEMPLATE.format(payload=payload)
+
+
+components.html(_HZ_MOUNT_HTML, height=380)
 box = st.empty()
-feedback = st.empty()
-def render(char: str, color: str):
-    with box.container():
-        st.markdown(BOX_TEMPLATE.format(char=char, color=color), unsafe_allow_html=True)
 
-    with feedback.container():
-        st.write(st.session_state.feedback)
+
+def render(i: int, variant: str):
+    s = st.session_state.s
+    key = (i, variant)
+    if key == s.last_render:
+        return
+    s.last_render = key
+
+    with box:
+        components.html(getattr(st.session_state.deck, "html_" + variant)[i], height=0)
 
 def evaluate_answer():
-    card = st.session_state.deck[st.session_state.idx]
+    s = st.session_state.s
+    deck = st.session_state.deck
+    i = st.session_state.order[s.idx]
     answer_norm = normalize(st.session_state.answer)
-    meaning_norms = [normalize(m) for m in card["english"]]
-    is_correct = answer_norm in meaning_norms
+    is_correct = answer_norm in deck.norm[i]
 
-    st.session_state.response_checked = True
-    st.session_state.timer_start = time.time()
-    st.session_state.correct = is_correct
+    s.response_checked = True
+    s.timer_start = time.time()
+    s.correct = is_correct
+    if is_correct:
+        s.score += 1
 
-    if st.session_state.correct:
-        st.session_state.score += 1
-        st.session_state.feedback = f"✅ Correct! {', '.join(card['english'])}"
-    else:
-        st.session_state.feedback = f"❌ Wrong. Correct: {','.join(card['english'])}"
+def _draw_card(idx: int):
+    """Fix which card is shown at position idx (one Fisher-Yates step).
+
+    The order list starts out unshuffled; each position is drawn lazily
+    when the quiz reaches it, so stopping early never pays for shuffling
+    the whole deck.
+    """
+    perm = st.session_state.order
+    j = st.session_state.rng.randrange(idx, len(perm))
+    perm[idx], perm[j] = perm[j], perm[idx]
 
-    char_color = BRIGHT_GREEN if st.session_state.correct else BRIGHT_RED
-    render(card["hanzi"], char_color)
-    if "Wrong" in st.session_state.feedback:
-        time.sleep(1.4)
-    else:
-        time.sleep(1.4)
 
 def advance_card():
-    st.session_state.idx += 1
+    s = st.session_state.s
+    s.idx += 1
+    if s.idx < len(st.session_state.order):
+        _draw_card(s.idx)
     st.session_state.answer = ""
-    st.session_state.response_checked = False
-    st.session_state.feedback = ""
-    st.session_state.correct = None
-    st.session_state.pop("timer_start", None)
+    s.response_checked = False
+    s.correct = None
+    s.timer_start = None
 
 
-# ---------- Session state init ----------
-if "deck" not in st.session_state:
-    st.session_state.deck = load_deck(DATA_FILE)
-    random.shuffle(st.session_state.deck)
-    st.session_state.idx = 0
-    st.session_state.score = 0
-    st.session_state.answer = ""
-    st.session_state.response_checked = False
-    st.session_state.correct = None
-    st.session_state.feedback = ""
+@st.fragment(run_every=0.25)
+def reveal_fragment():
+    """Show the colored Hanzi for one second, then move to the next card.
 
-# ---------- Auto‑advance after 1 s ----------
-if st.session_state.response_checked and "timer_start" in st.session_state:
-    elapsed = time.time() - st.session_state.timer_start
+    Only this fragment reruns while the reveal is on screen; the rest of
+    the app stays interactive.
+    """
+    s = st.session_state.s
+    i = st.session_state.order[s.idx]
+    elapsed = time.time() - s.timer_start
     if elapsed >= 1:
         advance_card()
-    else:
-        time.sleep(0.1)
         st.rerun()
+    render(i, "green" if s.correct else "red")
 
 
+# ---------- Session state init ----------
+if "deck" not in st.session_state:
+    st.session_state.deck = load_deck(DATA_FILE, CHAPTERS)
+    n_cards = len(st.session_state.deck.hanzi)
+    st.session_state.order = list(range(n_cards))
+    st.session_state.rng = random.Random()
+    st.session_state.answer = ""
+    st.session_state.s = QuizState()
+    if n_cards:
+        _draw_card(0)
+
+# The placeholder above was recreated empty on this full rerun, so the
+# dedupe key must be reset; it only suppresses repeat renders during
+# fragment ticks, where elements outside the fragment persist.
+st.session_state.s.last_render = (None, None)
+
 # ---------- Stop button ----------
 col_stop, _ = st.columns([1, 9])
 if col_stop.button("Stop"):
-    st.session_state.idx = len(st.session_state.deck)
+    st.session_state.s.idx = len(st.session_state.order)
 
 # ---------- End quiz ----------
-if st.session_state.idx >= len(st.session_state.deck):
+if st.session_state.s.idx >= len(st.session_state.order):
+    # The iframe DOM persists across reruns, so clear the last reveal
+    # before showing the results screen.
+    with box:
+        components.html(_sender_html("", char_color, ""), height=0)
     st.success(
-        f"Finished! Your score: {st.session_state.score}/{len(st.session_state.deck)} "
-        f"({st.session_state.score/len(st.session_state.deck)*100:.0f}%)"
+        f"Finished! Your score: {st.session_state.s.score}/{len(st.session_state.order)} "
+        f"({st.session_state.s.score/len(st.session_state.order)*100:.0f}%)"
     )
     if st.button("Restart"):
         for key in list(st.session_state.keys()):
             del st.session_state[key]
     st.stop()
 
-card = st.session_state.deck[st.session_state.idx]
 
+@st.fragment
+def card_view():
+    """Hanzi display plus answer input.
 
-
-def display_hanzi(char_color):
-    st.markdown(
-        f"""<div style='text-align:center; font-size: 200px; line-height:1; color:{char_color};'>
-            {card['hanzi']}
-        </div>""",
-        unsafe_allow_html=True,
+    Submitting an answer reruns only this fragment, not the whole
+    script; a full rerun happens just once per card, on advance.
+    """
+    s = st.session_state.s
+    if not s.response_checked:
+        i = st.session_state.order[s.idx]
+        render(i, "white")
+    else:
+        reveal_fragment()
+    # ---------- Input ----------
+    st.text_input(
+        "English meaning:",
+        key="answer",
+        on_change=evaluate_answer,
+        disabled=s.response_checked,
+        placeholder="Type meaning and press Enter…",
     )
-if not st.session_state.response_checked:
-    card = st.session_state.deck[st.session_state.idx]
-    try:
-        render(card["hanzi"], "#FFFFFF")
-    except:
-        st.write(card)
-# ---------- Input ----------
-st.text_input(
-    "English meaning:",
-    key="answer",
-    on_change=evaluate_answer,
-    disabled=st.session_state.response_checked,
-    placeholder="Type meaning and press Enter…",
-)
+
+
+card_view()
 